@@ -20,17 +20,32 @@ dask_jobs/dask_processing.py - Модуль параллельной обраб
 import os
 import re
 import glob
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+import psutil
 import dask
 from dask import delayed, compute
-from dask.distributed import Client, LocalCluster
+from dask.distributed import Client, LocalCluster, default_client
 import dask.dataframe as dd
 import dask.bag as db
 import pandas as pd
 import numpy as np
 
+# Numba для JIT-компиляции обобщения сообщений (опционально)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Заглушка декоратора: без Numba используется путь через regex"""
+        return lambda func: func
+
 
 # =============================================================================
 # КОНФИГУРАЦИЯ DASK
@@ -41,7 +56,69 @@ class DaskConfig:
     N_WORKERS = 4  # Количество воркеров
     THREADS_PER_WORKER = 2  # Потоков на воркер
     MEMORY_LIMIT = '4GB'  # Лимит памяти на воркер
+    # Воркеры-процессы: парсинг упирается в regex, а модуль re держит GIL,
+    # поэтому потоки одного процесса не дали бы параллелизма. Потоковые
+    # воркеры (False) выгодны для задач, отпускающих GIL, - там они
+    # экономят на сериализации данных между процессами
+    PROCESSES = True
     DASHBOARD_ADDRESS = ':8787'  # Адрес Dask Dashboard
+    # Формат результатов run_dask_pipeline: 'parquet' (колоночный, zstd,
+    # в разы меньше и быстрее перечитывается) или 'csv' (читается где угодно,
+    # пишется кусками по CSV_CHUNKSIZE строк)
+    OUTPUT_FORMAT = 'parquet'
+    PARQUET_ROW_GROUP_SIZE = 50_000  # Строк в row group parquet
+    CSV_CHUNKSIZE = 100_000  # Строк в куске при записи CSV
+
+
+# Формат строки лога: YYYY-MM-DDTHH:MM:SS LEVEL Category: Message.
+# Группы по порядку: временная метка, уровень, категория, сообщение.
+DEFAULT_LOG_PATTERN = (
+    r"^(?P<Timestamp>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})\s+(?P<Level>\w+)\s+"
+    r"(?P<Category>[^:]+):\s+(?P<Message>.*)"
+)
+
+
+@lru_cache(maxsize=16)
+def _compiled(pattern: str) -> re.Pattern:
+    """Компилирует шаблон строки лога один раз на процесс воркера"""
+    return re.compile(pattern)
+
+
+# Уровни, которые попадают в результат парсинга
+_LEVELS = frozenset(("WARNING", "ERROR"))
+
+# Шаблоны обобщения сообщений (IP, hex, числа, пунктуация, пробелы).
+# Применяются к целой колонке через Series.str.replace.
+_RE_IP = re.compile(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b')
+_RE_HEX = re.compile(r'0x[0-9a-f]+')
+_RE_NUM = re.compile(r'\b\d+\b')
+_RE_PUNCT = re.compile(r'[^\w\s]')
+_RE_WS = re.compile(r'\s+')
+
+# Формат временной метки: явный format включает быстрый C-парсер pandas
+_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# Байтовые маркеры уровней: строки отбрасываются до декодирования в str
+_INFO = b' INFO '
+_WARN = b' WARNING '
+_ERR = b' ERROR '
+
+# Колонки DataFrame с распарсенными логами
+_LOG_COLUMNS = ['Timestamp', 'Level', 'Category', 'Message', 'log', 'file_name', 'line_number']
+
+# Пустой DataFrame со схемой результата парсинга (meta для dd.from_delayed)
+_LOG_META = pd.DataFrame({
+    'Timestamp': pd.Series(dtype='datetime64[ns]'),
+    'Level': pd.Series(dtype=object),
+    'Category': pd.Series(dtype=object),
+    'Message': pd.Series(dtype=object),
+    'log': pd.Series(dtype=object),
+    'file_name': pd.Series(dtype=object),
+    'line_number': pd.Series(dtype='int32')
+})
+
+# Колонки с малым числом уникальных значений хранятся как category
+_CATEGORY_COLUMNS = ('Level', 'Category', 'file_name')
 
 
 # =============================================================================
@@ -50,7 +127,8 @@ class DaskConfig:
 
 def init_dask_cluster(n_workers: int = None, 
                       threads_per_worker: int = None,
-                      memory_limit: str = None) -> Client:
+                      memory_limit: str = None,
+                      processes: bool = None) -> Client:
     """
     Инициализирует локальный Dask кластер.
     
@@ -58,6 +136,7 @@ def init_dask_cluster(n_workers: int = None,
         n_workers: Количество воркеров (по умолчанию из конфига)
         threads_per_worker: Потоков на воркер
         memory_limit: Лимит памяти на воркер
+        processes: Воркеры-процессы (True) или потоки одного процесса (False)
     
     Возвращает:
         Client: Dask клиент для отправки задач
@@ -65,9 +144,11 @@ def init_dask_cluster(n_workers: int = None,
     n_workers = n_workers or DaskConfig.N_WORKERS
     threads_per_worker = threads_per_worker or DaskConfig.THREADS_PER_WORKER
     memory_limit = memory_limit or DaskConfig.MEMORY_LIMIT
+    if processes is None:
+        processes = DaskConfig.PROCESSES
     
     print(f">>> [DASK] Инициализация кластера...")
-    print(f"    - Воркеры: {n_workers}")
+    print(f"    - Воркеры: {n_workers} ({'процессы' if processes else 'потоки'})")
     print(f"    - Потоков на воркер: {threads_per_worker}")
     print(f"    - Лимит памяти: {memory_limit}")
     
@@ -75,6 +156,7 @@ def init_dask_cluster(n_workers: int = None,
         n_workers=n_workers,
         threads_per_worker=threads_per_worker,
         memory_limit=memory_limit,
+        processes=processes,
         dashboard_address=DaskConfig.DASHBOARD_ADDRESS
     )
     
@@ -96,71 +178,142 @@ def shutdown_dask_cluster(client: Client):
 # ПАРСИНГ ЛОГОВ С DASK
 # =============================================================================
 
-def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
+def _parse_log_file(filepath: str, line_pattern: str = DEFAULT_LOG_PATTERN) -> pd.DataFrame:
     """
-    Парсит одну строку лога.
+    Читает и парсит один лог-файл.
     
     Параметры:
-        line: Строка лога
+        filepath: Путь к файлу
+        line_pattern: Regex строки лога
     
     Возвращает:
-        Dict или None если строка не соответствует формату
+        DataFrame с распарсенными записями (колонки _LOG_COLUMNS)
     """
-    regex = r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})\s+(\w+)\s+([^:]+):\s+(.*)"
-    match = re.match(regex, line.strip())
+    filename = os.path.basename(filepath)
     
-    if match:
-        timestamp_str, level, category, message = match.groups()
-        if level in ['WARNING', 'ERROR']:
-            return {
-                'Timestamp': timestamp_str,
-                'Level': level,
-                'Category': category,
-                'Message': message,
-                'log': line.strip()
-            }
-    return None
+    try:
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+    except Exception as e:
+        print(f">>> [DASK] Ошибка при чтении {filename}: {e}")
+        return _LOG_META.copy()
+    
+    # Переводы строк '\r\n' и '\r' приводятся к '\n', как при чтении в
+    # текстовом режиме, чтобы номера строк не зависели от формата файла
+    raw = raw.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    
+    # Фильтр уровней на байтах: декодируются только строки WARNING/ERROR,
+    # номера строк считаются одним np.arange и отбираются той же маской.
+    # Маркеры с пробелами верны только для стандартного формата; для
+    # произвольного шаблона отбор грубее, уровень проверяет сам regex
+    raw_lines = raw.split(b'\n')
+    if line_pattern == DEFAULT_LOG_PATTERN:
+        keep = (_INFO not in line and (_WARN in line or _ERR in line) for line in raw_lines)
+    else:
+        keep = (b'WARNING' in line or b'ERROR' in line for line in raw_lines)
+    mask = np.fromiter(keep, dtype=bool, count=len(raw_lines))
+    line_numbers = np.arange(1, len(raw_lines) + 1, dtype=np.int32)[mask]
+    
+    lines = pd.Series(
+        [line.decode('utf-8', 'ignore') for line, keep in zip(raw_lines, mask) if keep],
+        index=line_numbers, dtype=object
+    )
+    return _parse_lines(lines, filename, line_pattern)
 
 
-@delayed
-def process_single_log_file(filepath: str) -> List[Dict[str, Any]]:
+def _parse_lines(lines: pd.Series, filename: str,
+                 line_pattern: str = DEFAULT_LOG_PATTERN) -> pd.DataFrame:
     """
-    Обрабатывает один лог-файл (delayed функция для Dask).
+    Векторно парсит отфильтрованные строки одного лог-файла.
+    
+    Regex выполняется внутри pandas для всей Series сразу.
     
     Параметры:
-        filepath: Путь к файлу
+        lines: Строки WARNING/ERROR; индекс - номер строки в файле
+        filename: Имя файла для колонки file_name
+        line_pattern: Regex строки с 4 группами (timestamp, level, category, message)
     
     Возвращает:
-        Список распарсенных записей
+        DataFrame с распарсенными записями (колонки _LOG_COLUMNS)
     """
-    filename = os.path.basename(filepath)
-    records = []
+    lines = lines.str.rstrip()
     
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            for line_num, line in enumerate(f, 1):
-                if ' INFO ' in line:
-                    continue
-                    
-                parsed = parse_log_line(line)
-                if parsed:
-                    parsed['file_name'] = filename
-                    parsed['line_number'] = line_num
-                    records.append(parsed)
-                    
-    except Exception as e:
-        print(f">>> [DASK] Ошибка при чтении {filename}: {e}")
+    # Явный формат метки времени известен только для стандартного шаблона,
+    # для остальных pandas определяет его сам
+    timestamp_format = _TIMESTAMP_FORMAT if line_pattern == DEFAULT_LOG_PATTERN else None
     
-    return records
+    parts = lines.str.extract(_compiled(line_pattern))
+    parts.columns = _LOG_COLUMNS[:4]
+    parts = parts[parts['Level'].isin(_LEVELS)]
+    
+    return parts.assign(
+        Timestamp=pd.to_datetime(
+            parts['Timestamp'], format=timestamp_format, errors='coerce', cache=True
+        ),
+        log=lines[parts.index],
+        file_name=filename,
+        line_number=parts.index
+    ).reset_index(drop=True)
 
 
-def parallel_parse_logs(log_directory: str, pattern: str = "*.txt") -> pd.DataFrame:
+def _parse_batch(files: List[str], line_pattern: str = DEFAULT_LOG_PATTERN) -> pd.DataFrame:
+    """
+    Парсит группу лог-файлов и возвращает один общий DataFrame.
+    
+    Параметры:
+        files: Пути к файлам
+        line_pattern: Regex строки лога
+    
+    Возвращает:
+        DataFrame с записями всех файлов группы
+    """
+    frames = [df for df in (_parse_log_file(f, line_pattern) for f in files) if len(df)]
+    if not frames:
+        return _LOG_META.copy()
+    return pd.concat(frames, ignore_index=True, copy=False)
+
+
+def _combine_log_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Собирает итоговый DataFrame из результатов воркеров.
+    
+    Параметры:
+        frames: DataFrame, полученные от задач Dask
+    
+    Возвращает:
+        Отсортированный по времени DataFrame (пустой, если записей нет)
+    """
+    frames = [df for df in frames if len(df)]
+    
+    if not frames:
+        return pd.DataFrame()
+    
+    # Склеиваем колоночные DataFrame воркеров без промежуточных dict
+    df = pd.concat(frames, ignore_index=True, copy=False)
+    for col in _CATEGORY_COLUMNS:
+        df[col] = df[col].astype('category')
+    df = df.dropna(subset=['Timestamp'])
+    # Внутри каждого файла строки уже идут по времени: стабильная сортировка
+    # (timsort) сливает готовые отсортированные участки почти за O(N)
+    return df.sort_values(by='Timestamp', kind='mergesort').reset_index(drop=True)
+
+
+@delayed
+def _process_batch(files_chunk: List[str], line_pattern: str) -> pd.DataFrame:
+    """Обрабатывает группу лог-файлов одной задачей Dask"""
+    return _parse_batch(files_chunk, line_pattern)
+
+
+def parallel_parse_logs(log_directory: str, pattern: str = "*.txt",
+                        line_pattern: str = DEFAULT_LOG_PATTERN) -> pd.DataFrame:
     """
     Параллельно парсит все лог-файлы в директории с использованием Dask.
     
     Параметры:
         log_directory: Директория с логами
         pattern: Паттерн для поиска файлов
+        line_pattern: Regex строки лога с 4 группами (timestamp, level,
+            category, message); компилируется один раз на процесс воркера
     
     Возвращает:
         DataFrame со всеми распарсенными логами
@@ -173,26 +326,31 @@ def parallel_parse_logs(log_directory: str, pattern: str = "*.txt") -> pd.DataFr
     
     print(f">>> [DASK] Найдено {len(log_files)} файлов для обработки")
     
-    # Создаем отложенные задачи для каждого файла
-    delayed_results = [process_single_log_file(f) for f in log_files]
+    # Группируем файлы в батчи: при тысячах мелких файлов задача на каждый
+    # файл тратит больше времени на планирование, чем на сам парсинг
+    n_threads = DaskConfig.N_WORKERS * DaskConfig.THREADS_PER_WORKER
+    chunk_size = max(1, len(log_files) // (n_threads * 4))
+    chunks = [log_files[i:i + chunk_size] for i in range(0, len(log_files), chunk_size)]
     
-    # Выполняем параллельную обработку
+    # Создаем отложенные задачи для каждого батча
+    delayed_results = [_process_batch(chunk, line_pattern) for chunk in chunks]
+    
+    # Собираем ленивый Dask DataFrame: фильтрация и сортировка выполняются
+    # на воркерах, а не на клиенте после материализации всех батчей
     print(f">>> [DASK] Запуск параллельной обработки...")
-    results = compute(*delayed_results)
+    ddf = dd.from_delayed(delayed_results, meta=_LOG_META, verify_meta=False)
     
-    # Объединяем результаты
-    all_records = []
-    for file_records in results:
-        all_records.extend(file_records)
+    # persist: set_index сначала считает границы партиций по Timestamp и
+    # только потом перемешивает данные - без persist файлы парсились бы дважды
+    ddf = ddf.dropna(subset=['Timestamp']).persist()
     
-    if not all_records:
+    if len(ddf) == 0:
         return pd.DataFrame()
     
-    # Создаем DataFrame
-    df = pd.DataFrame(all_records)
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-    df = df.dropna(subset=['Timestamp'])
-    df = df.sort_values(by='Timestamp').reset_index(drop=True)
+    # Глобальная сортировка параллельным shuffle Dask
+    df = ddf.set_index('Timestamp').compute().reset_index()
+    for col in _CATEGORY_COLUMNS:
+        df[col] = df[col].astype('category')
     
     print(f">>> [DASK] Обработано {len(df)} записей из {len(log_files)} файлов")
     
@@ -203,13 +361,59 @@ def parallel_parse_logs(log_directory: str, pattern: str = "*.txt") -> pd.DataFr
 # РАСПРЕДЕЛЁННАЯ ОБРАБОТКА С DASK BAG
 # =============================================================================
 
-def process_logs_with_bag(log_directory: str, pattern: str = "*.txt") -> pd.DataFrame:
+def _parse_text_records(records: List[Tuple[str, str]], line_pattern: str) -> pd.DataFrame:
+    """Парсит строки одного файла из db.read_text(include_path=True)"""
+    if line_pattern == DEFAULT_LOG_PATTERN:
+        keep = (' INFO ' not in line and (' WARNING ' in line or ' ERROR ' in line)
+                for line, _ in records)
+    else:
+        keep = ('WARNING' in line or 'ERROR' in line for line, _ in records)
+    mask = np.fromiter(keep, dtype=bool, count=len(records))
+    line_numbers = np.arange(1, len(records) + 1, dtype=np.int32)[mask]
+    
+    lines = pd.Series(
+        [line for (line, _), keep in zip(records, mask) if keep],
+        index=line_numbers, dtype=object
+    )
+    return _parse_lines(lines, os.path.basename(records[0][1]), line_pattern)
+
+
+def _parse_text_partition(records, line_pattern: str) -> List[pd.DataFrame]:
+    """
+    Парсит партицию db.read_text(include_path=True) - строки нескольких файлов.
+    
+    Строки одного файла идут в партиции подряд, поэтому они группируются
+    по пути, и нумерация строк начинается с 1 в каждом файле. DataFrame
+    оборачивается в список, чтобы Bag не итерировал его как
+    последовательность.
+    """
+    frames = [
+        df for df in (
+            _parse_text_records(list(group), line_pattern)
+            for _, group in groupby(records, key=itemgetter(1))
+        ) if len(df)
+    ]
+    if not frames:
+        return [_LOG_META.copy()]
+    return [pd.concat(frames, ignore_index=True, copy=False)]
+
+
+def process_logs_with_bag(log_directory: str, pattern: str = "*.txt",
+                          line_pattern: str = DEFAULT_LOG_PATTERN) -> pd.DataFrame:
     """
     Обрабатывает логи с использованием Dask Bag для потоковой обработки.
     
+    Файлы читаются через db.read_text: Dask сам открывает их на воркерах
+    и отдаёт строки партициями. Файлы не режутся на блоки (так сохраняются
+    номера строк), а группируются по несколько на партицию - примерно по
+    одной партиции на поток, чтобы тысячи мелких файлов не превращались
+    в тысячи задач. Каждая партиция возвращает один DataFrame, поэтому на
+    клиент не передаются отдельные записи.
+    
     Параметры:
         log_directory: Директория с логами
         pattern: Паттерн для поиска файлов
+        line_pattern: Regex строки лога
     
     Возвращает:
         DataFrame с результатами
@@ -221,37 +425,14 @@ def process_logs_with_bag(log_directory: str, pattern: str = "*.txt") -> pd.Data
     
     print(f">>> [DASK BAG] Обработка {len(log_files)} файлов...")
     
-    def read_and_parse_file(filepath: str) -> List[Dict]:
-        """Читает и парсит файл"""
-        filename = os.path.basename(filepath)
-        records = []
-        
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                for line_num, line in enumerate(f, 1):
-                    if ' INFO ' in line:
-                        continue
-                    parsed = parse_log_line(line)
-                    if parsed:
-                        parsed['file_name'] = filename
-                        parsed['line_number'] = line_num
-                        records.append(parsed)
-        except Exception as e:
-            print(f"Ошибка: {e}")
-        
-        return records
-    
-    # Создаем Bag из списка файлов и обрабатываем
-    bag = db.from_sequence(log_files)
-    results = bag.map(read_and_parse_file).flatten().compute()
-    
-    if not results:
-        return pd.DataFrame()
+    # Создаем Bag строк: blocksize=None - файлы целиком, по несколько на партицию
+    n_threads = DaskConfig.N_WORKERS * DaskConfig.THREADS_PER_WORKER
+    bag = db.read_text(log_files, blocksize=None, encoding='utf-8', errors='ignore',
+                       include_path=True,
+                       files_per_partition=max(1, len(log_files) // n_threads))
+    frames = bag.map_partitions(_parse_text_partition, line_pattern).compute()
     
-    df = pd.DataFrame(results)
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-    df = df.dropna(subset=['Timestamp'])
-    df = df.sort_values(by='Timestamp').reset_index(drop=True)
+    df = _combine_log_frames(frames)
     
     print(f">>> [DASK BAG] Результат: {len(df)} записей")
     
@@ -262,33 +443,79 @@ def process_logs_with_bag(log_directory: str, pattern: str = "*.txt") -> pd.Data
 # ПАРАЛЛЕЛЬНАЯ ГЕНЕРАЦИЯ ЭМБЕДДИНГОВ
 # =============================================================================
 
+def _encode_texts(model, texts: List[str], batch_size: int) -> np.ndarray:
+    """
+    Кодирует тексты одним вызовом model.encode.
+    
+    Модель сама режет вход на батчи по batch_size, поэтому на GPU запуски
+    ядер и копирования амортизируются на весь кусок. Если доступен torch,
+    кодирование идёт в inference_mode, а на CUDA с поддержкой bfloat16 -
+    под autocast в bf16 (вдвое меньше трафика памяти).
+    
+    Параметры:
+        model: SentenceTransformer модель
+        texts: Список текстов
+        batch_size: Размер внутреннего батча модели
+    
+    Возвращает:
+        Массив эмбеддингов float32
+    """
+    try:
+        import torch
+    except ImportError:
+        return model.encode(texts, batch_size=batch_size, show_progress_bar=False,
+                            convert_to_numpy=True)
+    
+    torch.set_float32_matmul_precision('high')
+    
+    with torch.inference_mode():
+        if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+            with torch.autocast(device_type='cuda', dtype=torch.bfloat16):
+                embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=False,
+                                          convert_to_tensor=True)
+            # bf16-тензор нельзя напрямую перевести в numpy
+            return embeddings.float().cpu().numpy()
+        
+        return model.encode(texts, batch_size=batch_size, show_progress_bar=False,
+                            convert_to_numpy=True)
+
+
 @delayed
-def generate_embeddings_batch(texts: List[str], model, batch_id: int) -> Tuple[int, np.ndarray]:
+def generate_embeddings_batch(texts: List[str], model, offset: int,
+                              batch_size: int = 64) -> Tuple[int, np.ndarray]:
     """
-    Генерирует эмбеддинги для батча текстов (delayed функция).
+    Генерирует эмбеддинги для куска текстов (delayed функция).
     
     Параметры:
         texts: Список текстов
-        model: SentenceTransformer модель
-        batch_id: ID батча для отслеживания
+        model: SentenceTransformer модель (или Future разосланной модели -
+            Dask подставит сам объект перед вызовом)
+        offset: Позиция первого текста куска в общем списке
+        batch_size: Размер внутреннего батча model.encode
     
     Возвращает:
-        Кортеж (batch_id, embeddings)
+        Кортеж (offset, embeddings)
     """
-    embeddings = model.encode(texts, show_progress_bar=False)
-    return batch_id, embeddings
+    return offset, _encode_texts(model, texts, batch_size)
 
 
 def parallel_generate_embeddings(texts: List[str], 
                                   model, 
-                                  batch_size: int = 100) -> np.ndarray:
+                                  batch_size: int = 64,
+                                  client: Optional[Client] = None) -> np.ndarray:
     """
     Параллельно генерирует эмбеддинги с использованием Dask.
     
+    Тексты делятся на столько кусков, сколько потоков в кластере, и каждый
+    кусок кодируется одним вызовом model.encode. При работе на кластере
+    модель один раз рассылается на все воркеры через client.scatter, а
+    задачи получают только ссылку на неё.
+    
     Параметры:
         texts: Список текстов для эмбеддинга
         model: SentenceTransformer модель
-        batch_size: Размер батча
+        batch_size: Размер внутреннего батча model.encode
+        client: Dask клиент (по умолчанию - активный клиент, если есть)
     
     Возвращает:
         NumPy массив эмбеддингов
@@ -296,23 +523,47 @@ def parallel_generate_embeddings(texts: List[str],
     if not texts:
         return np.array([])
     
-    # Разбиваем на батчи
-    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
-    
-    print(f">>> [DASK] Генерация эмбеддингов: {len(texts)} текстов, {len(batches)} батчей")
+    if client is None:
+        try:
+            client = default_client()
+        except ValueError:
+            client = None
+    
+    # Один кусок на поток: дробление на мелкие батчи снаружи модели
+    # лишает GPU амортизации запусков ядер
+    if client is not None:
+        n_chunks = sum(client.nthreads().values())
+    else:
+        n_chunks = DaskConfig.N_WORKERS
+    chunk_size = -(-len(texts) // max(1, n_chunks))
+    offsets = range(0, len(texts), chunk_size)
+    
+    print(f">>> [DASK] Генерация эмбеддингов: {len(texts)} текстов, {len(offsets)} кусков")
+    
+    # Без рассылки Dask сериализует модель (сотни МБ) в каждую задачу;
+    # локальный планировщик работает в одном процессе и передаёт её как есть
+    if client is not None:
+        model = client.scatter(model, broadcast=True, hash=False)
     
     # Создаем отложенные задачи
     delayed_results = [
-        generate_embeddings_batch(batch, model, idx) 
-        for idx, batch in enumerate(batches)
+        generate_embeddings_batch(texts[i:i + chunk_size], model, i, batch_size) 
+        for i in offsets
     ]
     
-    # Выполняем параллельно
-    results = compute(*delayed_results)
+    # Выполняем параллельно. Граф со ссылкой на разосланную модель должен
+    # считаться на том же клиенте, а не на планировщике по умолчанию
+    if client is not None:
+        results = client.compute(delayed_results, sync=True)
+    else:
+        results = compute(*delayed_results)
     
-    # Сортируем по batch_id и объединяем
-    results = sorted(results, key=lambda x: x[0])
-    all_embeddings = np.vstack([r[1] for r in results])
+    # Каждый кусок пишется сразу на своё место в заранее выделенный массив:
+    # без сортировки и без второй полноразмерной копии от np.vstack
+    first = results[0][1]
+    all_embeddings = np.empty((len(texts), first.shape[1]), dtype=first.dtype)
+    for offset, embeddings in results:
+        all_embeddings[offset:offset + len(embeddings)] = embeddings
     
     print(f">>> [DASK] Сгенерировано {len(all_embeddings)} эмбеддингов")
     
@@ -323,21 +574,46 @@ def parallel_generate_embeddings(texts: List[str],
 # DASK DATAFRAME ДЛЯ БОЛЬШИХ ДАННЫХ
 # =============================================================================
 
+def _auto_blocksize() -> int:
+    """
+    Подбирает размер блока чтения под память и число ядер машины.
+    
+    Около десятой доли памяти на ядро, но в пределах 8-64 МБ: мелкие
+    блоки на слабой машине загружают все ядра, крупные не приводят к OOM.
+    
+    Возвращает:
+        Размер блока в байтах
+    """
+    mem = psutil.virtual_memory().total
+    cores = psutil.cpu_count(logical=False) or 1
+    return max(8 << 20, min(64 << 20, mem // (cores * 10)))
+
+
 def load_large_csv_with_dask(filepath: str, 
-                              blocksize: str = '64MB') -> dd.DataFrame:
+                              blocksize: Optional[Any] = None,
+                              engine: str = 'pyarrow') -> dd.DataFrame:
     """
     Загружает большой CSV файл с использованием Dask DataFrame.
     
+    По умолчанию блоки читаются многопоточным парсером PyArrow, а колонки
+    хранятся в Arrow-типах: строки не превращаются в Python-объекты, и
+    группировка по ним в aggregate_with_dask идёт по Arrow-хешам.
+    
     Параметры:
         filepath: Путь к файлу или паттерн (например, 'data/*.csv')
-        blocksize: Размер блока для чтения
+        blocksize: Размер блока для чтения (None - подобрать через _auto_blocksize)
+        engine: Движок pandas.read_csv ('pyarrow' или 'c')
     
     Возвращает:
         Dask DataFrame
     """
     print(f">>> [DASK] Загрузка CSV: {filepath}")
     
-    ddf = dd.read_csv(filepath, blocksize=blocksize)
+    if blocksize is None:
+        blocksize = _auto_blocksize()
+        print(f"    - Размер блока: {blocksize // (1 << 20)} MB (авто)")
+    
+    ddf = dd.read_csv(filepath, blocksize=blocksize, engine=engine, dtype_backend='pyarrow')
     
     print(f">>> [DASK] Загружено {ddf.npartitions} партиций")
     
@@ -367,13 +643,213 @@ def aggregate_with_dask(ddf: dd.DataFrame,
     return result
 
 
+# =============================================================================
+# ОБОБЩЕНИЕ СООБЩЕНИЙ
+# =============================================================================
+
+# Токены-замены в виде байтов для JIT-версии обобщения
+_TOKEN_IP = np.frombuffer(b'ip_address', dtype=np.uint8)
+_TOKEN_HEX = np.frombuffer(b'hex_value', dtype=np.uint8)
+_TOKEN_NUM = np.frombuffer(b'number', dtype=np.uint8)
+
+
+@njit(cache=True)
+def _is_digit(c):
+    return 48 <= c <= 57
+
+
+@njit(cache=True)
+def _is_word(c):
+    """ASCII-аналог \\w: буквы, цифры и подчёркивание"""
+    return (48 <= c <= 57) or (65 <= c <= 90) or (97 <= c <= 122) or c == 95
+
+
+@njit(cache=True)
+def _lower(c):
+    return c + 32 if 65 <= c <= 90 else c
+
+
+@njit(cache=True)
+def _is_hex(c):
+    c = _lower(c)
+    return (48 <= c <= 57) or (97 <= c <= 102)
+
+
+@njit(cache=True)
+def _match_ip(buf, i, start, end):
+    """Конец совпадения _RE_IP, начинающегося в позиции i, или -1"""
+    if i > start and _is_word(buf[i - 1]):
+        return -1
+    j = i
+    for group in range(4):
+        k = j
+        while k < end and _is_digit(buf[k]):
+            k += 1
+        if k == j or k - j > 3:
+            return -1
+        if group < 3:
+            if k >= end or buf[k] != 46:
+                return -1
+            j = k + 1
+        elif k < end and _is_word(buf[k]):
+            return -1
+        else:
+            return k
+    return -1
+
+
+@njit(cache=True)
+def _match_hex(buf, i, end):
+    """Конец совпадения _RE_HEX, начинающегося в позиции i, или -1"""
+    if buf[i] != 48 or i + 2 >= end or _lower(buf[i + 1]) != 120 or not _is_hex(buf[i + 2]):
+        return -1
+    k = i + 2
+    while k < end and _is_hex(buf[k]):
+        k += 1
+    return k
+
+
+@njit(cache=True)
+def _match_num(buf, i, start, end):
+    """Конец совпадения _RE_NUM, начинающегося в позиции i, или -1"""
+    if i > start and _is_word(buf[i - 1]):
+        return -1
+    k = i
+    while k < end and _is_digit(buf[k]):
+        k += 1
+    if k < end and _is_word(buf[k]):
+        return -1
+    return k
+
+
+@njit(cache=True)
+def _generalize_ascii(buf, offsets, out, out_offsets, token_ip, token_hex, token_num):
+    """
+    Обобщает ASCII-сообщения за один проход по байтам.
+    
+    Сообщения лежат подряд в buf, границы - в offsets (n + 1 значений).
+    Результат пишется в out, его границы - в out_offsets. Поведение
+    совпадает с цепочкой _RE_IP -> _RE_HEX -> _RE_NUM -> _RE_PUNCT -> _RE_WS:
+    совпадения этих шаблонов в ASCII-тексте не пересекаются, поэтому
+    их можно искать в одном проходе.
+    """
+    o = 0
+    out_offsets[0] = 0
+    for m in range(len(offsets) - 1):
+        start = offsets[m]
+        end = offsets[m + 1]
+        msg_start = o
+        pending_space = False
+        i = start
+        while i < end:
+            c = buf[i]
+            k = -1
+            kind = 0
+            if _is_digit(c):
+                k = _match_ip(buf, i, start, end)
+                kind = 1
+                if k < 0 and c == 48:
+                    k = _match_hex(buf, i, end)
+                    kind = 2
+                if k < 0:
+                    k = _match_num(buf, i, start, end)
+                    kind = 3
+            
+            if k >= 0 or _is_word(c):
+                if pending_space:
+                    out[o] = 32
+                    o += 1
+                    pending_space = False
+                if k >= 0:
+                    token = token_ip if kind == 1 else (token_hex if kind == 2 else token_num)
+                    out[o:o + len(token)] = token
+                    o += len(token)
+                    i = k
+                    continue
+                out[o] = _lower(c)
+                o += 1
+            elif o > msg_start:
+                # Пунктуация и пробелы схлопываются в один пробел между словами
+                pending_space = True
+            i += 1
+        out_offsets[m + 1] = o
+
+
+def _generalize_messages_re(messages: pd.Series) -> pd.Series:
+    """Обобщение колонки цепочкой Series.str.replace по _RE_* шаблонам"""
+    col = messages.str.lower()
+    col = col.str.replace(_RE_IP, 'ip_address', regex=True)
+    col = col.str.replace(_RE_HEX, 'hex_value', regex=True)
+    col = col.str.replace(_RE_NUM, 'number', regex=True)
+    col = col.str.replace(_RE_PUNCT, ' ', regex=True)
+    col = col.str.replace(_RE_WS, ' ', regex=True).str.strip()
+    return col.fillna('')
+
+
+def _generalize_messages_jit(messages: pd.Series) -> pd.Series:
+    """
+    Обобщение колонки через _generalize_ascii.
+    
+    ASCII-сообщения склеиваются в один байтовый буфер со смещениями и
+    обрабатываются одним вызовом JIT-функции. Сообщения с не-ASCII
+    символами (кириллица и т.п.) идут через regex-путь, т.к. \\w и
+    lower() для них нельзя воспроизвести побайтово.
+    """
+    values = messages.tolist()
+    is_str = np.fromiter((isinstance(text, str) for text in values), dtype=bool, count=len(values))
+    is_ascii = np.fromiter(
+        (ok and text.isascii() for text, ok in zip(values, is_str)),
+        dtype=bool, count=len(values)
+    )
+    
+    encoded = [text.encode('ascii') for text, ok in zip(values, is_ascii) if ok]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    buf = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    
+    # Худший случай роста: однозначное число -> 'number' (6 байт на байт)
+    out = np.empty(max(1, 6 * len(buf)), dtype=np.uint8)
+    out_offsets = np.empty_like(offsets)
+    _generalize_ascii(buf, offsets, out, out_offsets, _TOKEN_IP, _TOKEN_HEX, _TOKEN_NUM)
+    
+    data = out[:out_offsets[-1]].tobytes()
+    bounds = out_offsets.tolist()
+    
+    result = pd.Series('', index=messages.index, dtype=object)
+    result[is_ascii] = [data[a:b].decode('ascii') for a, b in zip(bounds[:-1], bounds[1:])]
+    needs_re = is_str & ~is_ascii
+    if needs_re.any():
+        result[needs_re] = _generalize_messages_re(messages[needs_re])
+    return result
+
+
+def generalize_messages(messages: pd.Series) -> pd.Series:
+    """
+    Обобщает колонку сообщений для ML-анализа.
+    
+    При наличии Numba используется однопроходная JIT-функция по байтовому
+    буферу всей колонки, иначе - цепочка Series.str.replace по
+    предкомпилированным шаблонам. Результат в обоих случаях одинаковый.
+    
+    Параметры:
+        messages: Series с текстами сообщений
+    
+    Возвращает:
+        Series с обобщёнными сообщениями (нестроковые значения -> "")
+    """
+    if NUMBA_AVAILABLE and len(messages):
+        return _generalize_messages_jit(messages)
+    return _generalize_messages_re(messages)
+
+
 # =============================================================================
 # ОСНОВНАЯ ФУНКЦИЯ ОБРАБОТКИ
 # =============================================================================
 
 def run_dask_pipeline(log_directory: str,
                       output_directory: str = None,
-                      use_cluster: bool = True) -> pd.DataFrame:
+                      use_cluster: bool = True,
+                      output_format: str = None) -> pd.DataFrame:
     """
     Запускает полный Dask пайплайн обработки логов.
     
@@ -381,11 +857,14 @@ def run_dask_pipeline(log_directory: str,
         log_directory: Директория с логами
         output_directory: Директория для результатов
         use_cluster: Использовать ли Dask кластер
+        output_format: Формат результатов ('parquet' или 'csv',
+            по умолчанию DaskConfig.OUTPUT_FORMAT)
     
     Возвращает:
         DataFrame с обработанными данными
     """
     client = None
+    output_format = output_format or DaskConfig.OUTPUT_FORMAT
     
     try:
         if use_cluster:
@@ -406,25 +885,15 @@ def run_dask_pipeline(log_directory: str,
         # Шаг 2: Генерация обобщённых сообщений
         print("\n>>> Шаг 2: Обобщение сообщений...")
         
-        def generalize_message(text):
-            if not isinstance(text, str):
-                return ""
-            text = text.lower()
-            text = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', 'ip_address', text)
-            text = re.sub(r'0x[0-9a-f]+', 'hex_value', text)
-            text = re.sub(r'\b\d+\b', 'number', text)
-            text = re.sub(r'[^\w\s]', ' ', text)
-            text = re.sub(r'\s+', ' ', text).strip()
-            return text
-        
-        logs_df['Generalized_Message'] = logs_df['Message'].apply(generalize_message)
+        logs_df['Generalized_Message'] = generalize_messages(logs_df['Message'])
         
         # Шаг 3: Статистика
         print("\n>>> Шаг 3: Расчёт статистики...")
+        level_counts = logs_df['Level'].value_counts()
         stats = {
             'total_records': len(logs_df),
-            'errors': len(logs_df[logs_df['Level'] == 'ERROR']),
-            'warnings': len(logs_df[logs_df['Level'] == 'WARNING']),
+            'errors': int(level_counts.get('ERROR', 0)),
+            'warnings': int(level_counts.get('WARNING', 0)),
             'unique_files': logs_df['file_name'].nunique(),
             'time_range': f"{logs_df['Timestamp'].min()} - {logs_df['Timestamp'].max()}"
         }
@@ -438,8 +907,14 @@ def run_dask_pipeline(log_directory: str,
         # Сохранение результатов
         if output_directory:
             os.makedirs(output_directory, exist_ok=True)
-            output_path = os.path.join(output_directory, 'dask_processed_logs.csv')
-            logs_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+            if output_format == 'parquet':
+                output_path = os.path.join(output_directory, 'dask_processed_logs.parquet')
+                logs_df.to_parquet(output_path, engine='pyarrow', compression='zstd',
+                                   index=False, row_group_size=DaskConfig.PARQUET_ROW_GROUP_SIZE)
+            else:
+                output_path = os.path.join(output_directory, 'dask_processed_logs.csv')
+                logs_df.to_csv(output_path, index=False, encoding='utf-8-sig',
+                               chunksize=DaskConfig.CSV_CHUNKSIZE)
             print(f"\n>>> Результаты сохранены: {output_path}")
         
         print("\n" + "=" * 60)
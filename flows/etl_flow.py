@@ -17,8 +17,17 @@ flows/etl_flow.py - ETL Pipeline для обработки логов
 """
 
 import os
+import re
+import io
+import csv
+import json
+import logging
+import codecs
+import mmap
 import sys
 import glob
+import shutil
+import threading
 import zipfile
 import tempfile
 import pandas as pd
@@ -26,6 +35,9 @@ import numpy as np
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger('etl')
 
 # Добавляем родительскую директорию для импортов
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -45,12 +57,47 @@ except ImportError:
 # Импорт для работы с PostgreSQL
 try:
     import psycopg2
-    from psycopg2.extras import execute_values
+    import psycopg2.pool
     POSTGRES_AVAILABLE = True
 except ImportError:
     POSTGRES_AVAILABLE = False
     print(">>> [ETL] psycopg2 недоступен, результаты будут сохранены в файлы")
 
+# Импорт PyArrow для быстрого чтения лог-файлов (ставится вместе с dask[complete])
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Импорт xlsxwriter для потоковой записи Excel
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+
+# =============================================================================
+# РЕГУЛЯРНЫЕ ВЫРАЖЕНИЯ
+# =============================================================================
+
+# Компилируются один раз при импорте, а не на каждой строке лога.
+# Шаблон строки привязан к началу и сразу отбирает уровни WARNING/ERROR
+_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})\s+(WARNING|ERROR)\s+([^:]+):\s+(.*)")
+
+# Обобщение сообщений за один проход: IP, hex, числа и пунктуация
+# объединены в одну альтернацию, замена выбирается по имени группы
+_GEN_RE = re.compile(
+    r"(?P<ip>\b\d{1,3}(?:\.\d{1,3}){3}\b)"
+    r"|(?P<hex>0x[0-9a-f]+)"
+    r"|(?P<num>\b\d+\b)"
+    r"|(?P<punct>[^\w\s]+)"
+)
+_GEN_SUB = {'ip': 'ip_address', 'hex': 'hex_value', 'num': 'number', 'punct': ' '}
+_WS_RE = re.compile(r'\s+')
+
 
 # =============================================================================
 # КОНФИГУРАЦИЯ
@@ -74,6 +121,14 @@ class ETLConfig:
     # Обработка
     BATCH_SIZE = 1000
     USE_DASK = True
+    COPY_BUFSIZE = 1 << 20  # Буфер копирования файлов из ZIP (1 МБ)
+    READ_BUFSIZE = 1 << 20  # Буфер чтения лог-файлов (1 МБ)
+    # С какого числа файлов парсинг без Dask идёт в пуле процессов:
+    # на паре файлов запуск процессов дороже самого парсинга
+    PARALLEL_PARSE_MIN_FILES = 4
+    
+    # Имена файла базы знаний в порядке приоритета
+    KB_FILE_NAMES = ("anomalies_problems.csv", "anomalies_problems.xlsx")
     
     @classmethod
     def get_postgres_conn_string(cls) -> str:
@@ -129,6 +184,44 @@ class ETLTask:
 # EXTRACT - ИЗВЛЕЧЕНИЕ ДАННЫХ
 # =============================================================================
 
+def _scan_tree(root: Path) -> Tuple[List[Path], Optional[Path]]:
+    """
+    Обходит дерево каталогов один раз и находит лог-файлы и базу знаний.
+    
+    Параметры:
+        root: Корневая директория
+    
+    Возвращает:
+        (список .txt файлов, путь к базе знаний или None)
+    """
+    log_files = []
+    kb_found = {}
+    stack = [str(root)]
+    
+    while stack:
+        # Нечитаемые директории пропускаются, как это делал rglob
+        try:
+            it = os.scandir(stack.pop())
+        except PermissionError:
+            continue
+        
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                
+                # normcase: на Windows имена сравниваются без учёта регистра, как в rglob
+                name = os.path.normcase(entry.name)
+                if name.endswith('.txt'):
+                    log_files.append(Path(entry.path))
+                elif name in ETLConfig.KB_FILE_NAMES:
+                    kb_found.setdefault(name, Path(entry.path))
+    
+    kb_file = next((kb_found[n] for n in ETLConfig.KB_FILE_NAMES if n in kb_found), None)
+    return log_files, kb_file
+
+
 class ExtractTask(ETLTask):
     """
     Задача извлечения данных из источников.
@@ -152,10 +245,8 @@ class ExtractTask(ETLTask):
         Возвращает:
             Dict с извлечёнными данными и метаданными
         """
-        print(f"\n{'='*60}")
-        print(f"[EXTRACT] Начало извлечения данных")
-        print(f"{'='*60}")
-        print(f"Источник: {source_path}")
+        logger.info("[EXTRACT] Начало извлечения данных")
+        logger.info("Источник: %s", source_path)
         
         source = Path(source_path)
         
@@ -170,24 +261,50 @@ class ExtractTask(ETLTask):
     
     def _extract_from_zip(self, zip_path: Path) -> Dict[str, Any]:
         """Извлекает данные из ZIP архива"""
-        print(f">>> Извлечение из ZIP: {zip_path.name}")
+        logger.info("Извлечение из ZIP: %s", zip_path.name)
         
         temp_dir = ETLConfig.TEMP_DIR / f"extract_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         temp_dir.mkdir(parents=True, exist_ok=True)
         
+        # Распаковываем только лог-файлы и базу знаний, сразу запоминая
+        # их пути - повторный обход temp_dir после распаковки не нужен
+        log_files = []
+        kb_found = {}
+        root = temp_dir.resolve()
+        
         with zipfile.ZipFile(zip_path, 'r') as zf:
-            zf.extractall(temp_dir)
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                
+                # Как и extractall, отбрасываем диск ('C:'), абсолютные пути и '..'
+                arcname = os.path.splitdrive(info.filename.replace('\\', '/'))[1]
+                parts = [p for p in arcname.split('/') if p not in ('', '.', '..')]
+                if not parts:
+                    continue
+                
+                # normcase: на Windows имена сравниваются без учёта регистра, как в rglob
+                name = os.path.normcase(parts[-1])
+                is_log = name.endswith('.txt')
+                if not is_log and name not in ETLConfig.KB_FILE_NAMES:
+                    continue
+                
+                target = temp_dir.joinpath(*parts)
+                # Защита от zip-slip: файл должен оказаться внутри temp_dir
+                if not target.resolve().is_relative_to(root):
+                    logger.warning("Пропущен файл вне директории распаковки: %s", info.filename)
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                
+                with zf.open(info) as src, open(target, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, length=ETLConfig.COPY_BUFSIZE)
+                
+                if is_log:
+                    log_files.append(target)
+                else:
+                    kb_found.setdefault(name, target)
         
-        # Ищем лог-файлы
-        log_files = list(temp_dir.rglob("*.txt"))
-        
-        # Ищем базу знаний
-        kb_file = None
-        for pattern in ["anomalies_problems.csv", "anomalies_problems.xlsx"]:
-            found = list(temp_dir.rglob(pattern))
-            if found:
-                kb_file = found[0]
-                break
+        kb_file = next((kb_found[n] for n in ETLConfig.KB_FILE_NAMES if n in kb_found), None)
         
         result = {
             'source_type': 'zip',
@@ -199,25 +316,17 @@ class ExtractTask(ETLTask):
             'extracted_at': datetime.now().isoformat()
         }
         
-        print(f">>> Извлечено {len(log_files)} лог-файлов")
+        logger.info("Извлечено %s лог-файлов", len(log_files))
         if kb_file:
-            print(f">>> База знаний: {kb_file.name}")
+            logger.info("База знаний: %s", kb_file.name)
         
         return result
     
     def _extract_from_directory(self, dir_path: Path) -> Dict[str, Any]:
         """Извлекает данные из директории"""
-        print(f">>> Сканирование директории: {dir_path}")
-        
-        log_files = list(dir_path.rglob("*.txt"))
+        logger.info("Сканирование директории: %s", dir_path)
         
-        # Ищем базу знаний
-        kb_file = None
-        for pattern in ["anomalies_problems.csv", "anomalies_problems.xlsx"]:
-            found = list(dir_path.rglob(pattern))
-            if found:
-                kb_file = found[0]
-                break
+        log_files, kb_file = _scan_tree(dir_path)
         
         result = {
             'source_type': 'directory',
@@ -229,13 +338,13 @@ class ExtractTask(ETLTask):
             'extracted_at': datetime.now().isoformat()
         }
         
-        print(f">>> Найдено {len(log_files)} лог-файлов")
+        logger.info("Найдено %s лог-файлов", len(log_files))
         
         return result
     
     def _extract_from_file(self, file_path: Path) -> Dict[str, Any]:
         """Извлекает данные из одного файла"""
-        print(f">>> Чтение файла: {file_path.name}")
+        logger.info("Чтение файла: %s", file_path.name)
         
         return {
             'source_type': 'file',
@@ -252,6 +361,187 @@ class ExtractTask(ETLTask):
 # TRANSFORM - ТРАНСФОРМАЦИЯ ДАННЫХ
 # =============================================================================
 
+def _read_log_lines(filepath: str) -> pd.Series:
+    """
+    Читает лог-файл целиком в Series строк, индексированную номерами строк.
+    
+    При наличии PyArrow файл читается многопоточным C++ CSV-ридером
+    как одна колонка с разделителем '\x01' и без кавычек. Если файл не
+    удаётся так разобрать (битый UTF-8, пустой файл) или в строках есть
+    символ '\x01' (получилось больше одной колонки), используется чтение
+    через Python.
+    
+    Параметры:
+        filepath: Путь к лог-файлу
+    
+    Возвращает:
+        Series строк файла с индексом 1..N
+    """
+    if PYARROW_AVAILABLE:
+        try:
+            table = pa_csv.read_csv(
+                filepath,
+                read_options=pa_csv.ReadOptions(
+                    use_threads=True,
+                    block_size=8 << 20,
+                    autogenerate_column_names=True
+                ),
+                parse_options=pa_csv.ParseOptions(
+                    delimiter='\x01',
+                    quote_char=False,
+                    escape_char=False,
+                    double_quote=False,
+                    ignore_empty_lines=False
+                ),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={'f0': pa.string()}
+                )
+            )
+        except pa.ArrowInvalid:
+            table = None
+        
+        # Больше одной колонки - в строках есть '\x01' (например, FIX-сообщения);
+        # column(0) обрезал бы их, поэтому читаем файл через Python
+        if table is not None and table.num_columns == 1:
+            lines = table.column(0).to_pandas()
+            lines.index = np.arange(1, len(lines) + 1)
+            return lines
+    
+    lines = _read_lines_buffered(filepath)
+    return pd.Series(lines, index=np.arange(1, len(lines) + 1))
+
+
+def _read_lines_buffered(filepath: str, bufsize: int = None) -> List[str]:
+    """
+    Читает файл крупными бинарными блоками с инкрементальным декодированием.
+    
+    Переводы строк '\r\n' и '\r' приводятся к '\n', как при чтении
+    в текстовом режиме, поэтому нумерация строк совпадает с построчным
+    чтением. Неполная последняя строка блока переносится в следующий.
+    
+    Параметры:
+        filepath: Путь к файлу
+        bufsize: Размер блока чтения (по умолчанию ETLConfig.READ_BUFSIZE)
+    
+    Возвращает:
+        Список строк файла
+    """
+    bufsize = bufsize or ETLConfig.READ_BUFSIZE
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    lines = []
+    tail = ''
+    
+    with open(filepath, 'rb', buffering=bufsize) as f:
+        while True:
+            chunk = f.read(bufsize)
+            final = not chunk
+            text = tail + decoder.decode(chunk, final=final)
+            
+            # '\r' в конце блока может оказаться первой половиной '\r\n'
+            carry = ''
+            if not final and text.endswith('\r'):
+                text, carry = text[:-1], '\r'
+            
+            parts = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+            tail = parts.pop() + carry
+            lines.extend(parts)
+            
+            if final:
+                lines.append(tail)
+                return lines
+
+
+def _contains_levels(filepath: str) -> bool:
+    """
+    Быстро проверяет, есть ли в файле подстроки WARNING или ERROR.
+    
+    Поиск идёт по отображённому в память файлу (mmap.find на уровне C),
+    так что файлы только с INFO отбрасываются без чтения строк.
+    
+    Параметры:
+        filepath: Путь к лог-файлу
+    
+    Возвращает:
+        True, если файл может содержать записи WARNING/ERROR
+    """
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(b'WARNING') != -1 or mm.find(b'ERROR') != -1
+
+
+def _generalize_series(messages: pd.Series) -> pd.Series:
+    """
+    Обобщает колонку сообщений для ML-анализа.
+    
+    Цепочка Series.str обрабатывает только уникальные сообщения,
+    результат раскладывается обратно по всем строкам.
+    
+    Параметры:
+        messages: Series сообщений
+    
+    Возвращает:
+        Series обобщённых сообщений с тем же индексом (нестроковые значения -> "")
+    """
+    unique = messages.drop_duplicates()
+    is_str = unique.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    
+    generalized = pd.Series('', index=unique.index, dtype=object)
+    if is_str.any():
+        generalized[is_str] = (
+            unique[is_str].astype(object).str.lower()
+            .str.replace(_GEN_RE, lambda m: _GEN_SUB[m.lastgroup], regex=True)
+            .str.replace(_WS_RE, ' ', regex=True)
+            .str.strip()
+        )
+    
+    return messages.map(dict(zip(unique, generalized)))
+
+
+def _parse_one_file(filepath: str) -> pd.DataFrame:
+    """
+    Парсит один лог-файл, оставляя только записи WARNING/ERROR.
+    
+    Функция модульного уровня, чтобы её можно было передать
+    в ProcessPoolExecutor.
+    
+    Параметры:
+        filepath: Путь к лог-файлу
+    
+    Возвращает:
+        DataFrame с записями файла (пустой при ошибке чтения)
+    """
+    filename = os.path.basename(filepath)
+    
+    try:
+        if not _contains_levels(filepath):
+            return pd.DataFrame()
+        
+        lines = _read_log_lines(filepath)
+        lines = lines[lines.str.contains('WARNING|ERROR', regex=True)].str.strip()
+        
+        parts = lines.str.extract(_LINE_RE)
+        matched = parts[1].notna().to_numpy()
+        parts, lines = parts[matched], lines[matched]
+        
+        # Кадр собирается сразу из готовых колонок, без переименования и assign
+        return pd.DataFrame({
+            'Timestamp': parts[0],
+            'Level': parts[1],
+            'Category': parts[2],
+            'Message': parts[3],
+            'log': lines,
+            'file_name': filename,
+            'line_number': parts.index.to_numpy(),
+            'Generalized_Message': _generalize_series(parts[3])
+        }, copy=False)
+        
+    except Exception as e:
+        logger.warning("Ошибка при чтении %s: %s", filename, e)
+        return pd.DataFrame()
+
+
 class TransformTask(ETLTask):
     """
     Задача трансформации данных.
@@ -276,48 +566,46 @@ class TransformTask(ETLTask):
         Возвращает:
             Dict с трансформированными данными
         """
-        print(f"\n{'='*60}")
-        print(f"[TRANSFORM] Начало трансформации данных")
-        print(f"{'='*60}")
+        logger.info("[TRANSFORM] Начало трансформации данных")
         
         temp_dir = extract_result['temp_dir']
         log_files = extract_result['log_files']
         
-        print(f">>> Обработка {len(log_files)} файлов...")
+        logger.info("Обработка %s файлов...", len(log_files))
         
         # Используем Dask если доступен
         if DASK_AVAILABLE and ETLConfig.USE_DASK and len(log_files) > 1:
-            print(">>> Использование Dask для параллельной обработки")
+            logger.info("Использование Dask для параллельной обработки")
             logs_df = parallel_parse_logs(temp_dir)
         else:
-            print(">>> Последовательная обработка файлов")
+            logger.info("Последовательная обработка файлов")
             logs_df = self._sequential_parse(log_files)
         
         if logs_df.empty:
-            print(">>> WARNING: Не найдено записей WARNING/ERROR")
+            logger.warning("Не найдено записей WARNING/ERROR")
             return {
                 'logs_df': pd.DataFrame(),
                 'stats': {'total': 0, 'errors': 0, 'warnings': 0},
                 'transformed_at': datetime.now().isoformat()
             }
         
-        # Генерализация сообщений
-        print(">>> Генерализация сообщений...")
-        logs_df['Generalized_Message'] = logs_df['Message'].apply(self._generalize_message)
+        # Генерализация сообщений (последовательный парсинг делает её сразу)
+        if 'Generalized_Message' not in logs_df.columns:
+            logger.info("Генерализация сообщений...")
+            logs_df['Generalized_Message'] = _generalize_series(logs_df['Message'])
         
         # Статистика
         stats = {
             'total': len(logs_df),
-            'errors': len(logs_df[logs_df['Level'] == 'ERROR']),
-            'warnings': len(logs_df[logs_df['Level'] == 'WARNING']),
+            'errors': int((logs_df['Level'] == 'ERROR').sum()),
+            'warnings': int((logs_df['Level'] == 'WARNING').sum()),
             'unique_files': logs_df['file_name'].nunique(),
             'time_range_start': str(logs_df['Timestamp'].min()),
             'time_range_end': str(logs_df['Timestamp'].max())
         }
         
-        print(f">>> Обработано записей: {stats['total']}")
-        print(f"    - ERROR: {stats['errors']}")
-        print(f"    - WARNING: {stats['warnings']}")
+        logger.info("Обработано записей: %s (ERROR: %s, WARNING: %s)",
+                    stats['total'], stats['errors'], stats['warnings'])
         
         return {
             'logs_df': logs_df,
@@ -327,79 +615,65 @@ class TransformTask(ETLTask):
         }
     
     def _sequential_parse(self, log_files: List[str]) -> pd.DataFrame:
-        """Последовательный парсинг файлов"""
-        import re
-        
-        all_records = []
+        """Парсинг файлов без Dask (в пуле процессов, если файлов много)"""
+        if len(log_files) >= ETLConfig.PARALLEL_PARSE_MIN_FILES:
+            n_workers = min(len(log_files), os.cpu_count() or 1)
+            chunksize = max(1, len(log_files) // (4 * n_workers))
+            with ProcessPoolExecutor(max_workers=n_workers) as ex:
+                frames = list(ex.map(_parse_one_file, log_files, chunksize=chunksize))
+        else:
+            frames = [_parse_one_file(fp) for fp in log_files]
         
-        for filepath in log_files:
-            filename = os.path.basename(filepath)
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line_num, line in enumerate(f, 1):
-                        if ' INFO ' in line:
-                            continue
-                        
-                        parsed = self._parse_log_line(line.strip())
-                        if parsed:
-                            parsed['file_name'] = filename
-                            parsed['line_number'] = line_num
-                            all_records.append(parsed)
-                            
-            except Exception as e:
-                print(f">>> Ошибка при чтении {filename}: {e}")
-        
-        if not all_records:
+        frames = [f for f in frames if not f.empty]
+        if not frames:
             return pd.DataFrame()
         
-        df = pd.DataFrame(all_records)
-        df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
+        df = pd.concat(frames, ignore_index=True, copy=False)
+        df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='%Y-%m-%dT%H:%M:%S',
+                                         errors='coerce', cache=True)
         df = df.dropna(subset=['Timestamp'])
-        df = df.sort_values(by='Timestamp').reset_index(drop=True)
-        
-        return df
-    
-    def _parse_log_line(self, line: str) -> Optional[Dict]:
-        """Парсит строку лога"""
-        import re
-        
-        regex = r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})\s+(\w+)\s+([^:]+):\s+(.*)"
-        match = re.match(regex, line)
-        
-        if match:
-            timestamp_str, level, category, message = match.groups()
-            if level in ['WARNING', 'ERROR']:
-                return {
-                    'Timestamp': timestamp_str,
-                    'Level': level,
-                    'Category': category,
-                    'Message': message,
-                    'log': line
-                }
-        return None
-    
-    def _generalize_message(self, text: str) -> str:
-        """Обобщает сообщение для ML-анализа"""
-        import re
-        
-        if not isinstance(text, str):
-            return ""
+        # Логи обычно уже упорядочены по времени - тогда сортировка не нужна.
+        # Иначе стабильная сортировка (timsort) использует то, что кадры
+        # отдельных файлов уже отсортированы, и лишь сливает эти серии
+        if df['Timestamp'].is_monotonic_increasing:
+            df = df.reset_index(drop=True)
+        else:
+            df = df.sort_values(by='Timestamp', kind='stable').reset_index(drop=True)
         
-        text = text.lower()
-        text = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', 'ip_address', text)
-        text = re.sub(r'0x[0-9a-f]+', 'hex_value', text)
-        text = re.sub(r'\b\d+\b', 'number', text)
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
+        # Низкокардинальные колонки храним как категории: int-коды вместо строк
+        for col in ('Level', 'Category', 'file_name'):
+            df[col] = df[col].astype('category')
         
-        return text
+        return df
 
 
 # =============================================================================
 # LOAD - ЗАГРУЗКА ДАННЫХ
 # =============================================================================
 
+# Пул соединений с PostgreSQL создаётся при первой загрузке и
+# переиспользуется между запусками пайплайна
+_PG_POOL = None
+_PG_POOL_LOCK = threading.Lock()
+_PG_TABLE_READY = False
+
+
+def _get_pg_pool():
+    """Возвращает общий пул соединений PostgreSQL, создавая его при первом вызове"""
+    global _PG_POOL
+    with _PG_POOL_LOCK:
+        if _PG_POOL is None:
+            _PG_POOL = psycopg2.pool.ThreadedConnectionPool(
+                1, 8,
+                host=ETLConfig.POSTGRES_HOST,
+                port=ETLConfig.POSTGRES_PORT,
+                database=ETLConfig.POSTGRES_DB,
+                user=ETLConfig.POSTGRES_USER,
+                password=ETLConfig.POSTGRES_PASSWORD
+            )
+        return _PG_POOL
+
+
 class LoadTask(ETLTask):
     """
     Задача загрузки данных в хранилище.
@@ -425,15 +699,13 @@ class LoadTask(ETLTask):
         Возвращает:
             Dict с информацией о сохранённых данных
         """
-        print(f"\n{'='*60}")
-        print(f"[LOAD] Загрузка данных в хранилище")
-        print(f"{'='*60}")
+        logger.info("[LOAD] Загрузка данных в хранилище")
         
         logs_df = transform_result['logs_df']
         stats = transform_result['stats']
         
         if logs_df.empty:
-            print(">>> WARNING: Нет данных для загрузки")
+            logger.warning("Нет данных для загрузки")
             return {'status': 'no_data', 'files': []}
         
         # Создаём директорию для результатов
@@ -442,34 +714,43 @@ class LoadTask(ETLTask):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         saved_files = []
         
-        # Сохраняем в PostgreSQL
-        if output_format in ["postgres", "all"] and POSTGRES_AVAILABLE:
-            try:
-                self._save_to_postgres(logs_df, stats)
-                saved_files.append({'type': 'postgres', 'table': 'log_entries'})
-            except Exception as e:
-                print(f">>> WARNING: Не удалось сохранить в PostgreSQL: {e}")
-        
-        # Сохраняем в CSV
-        if output_format in ["csv", "all"]:
-            csv_path = ETLConfig.OUTPUT_DIR / f"logs_{timestamp}.csv"
-            logs_df.to_csv(csv_path, index=False, encoding='utf-8-sig')
-            print(f">>> Сохранено в CSV: {csv_path}")
-            saved_files.append({'type': 'csv', 'path': str(csv_path)})
-        
-        # Сохраняем в Excel
-        if output_format in ["excel", "all"]:
-            excel_path = ETLConfig.OUTPUT_DIR / f"logs_{timestamp}.xlsx"
-            logs_df.to_excel(excel_path, index=False, engine='openpyxl')
-            print(f">>> Сохранено в Excel: {excel_path}")
-            saved_files.append({'type': 'excel', 'path': str(excel_path)})
-        
-        # Сохраняем статистику
-        stats_path = ETLConfig.OUTPUT_DIR / f"stats_{timestamp}.json"
-        import json
-        with open(stats_path, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, indent=2, ensure_ascii=False)
-        saved_files.append({'type': 'json', 'path': str(stats_path)})
+        # Приёмники независимы и в основном ждут диск/сеть - пишем их
+        # параллельно в потоках. Порядок saved_files сохраняется
+        jobs = []
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            # Сохраняем в PostgreSQL
+            if output_format in ["postgres", "all"] and POSTGRES_AVAILABLE:
+                jobs.append(({'type': 'postgres', 'table': 'log_entries'},
+                             ex.submit(self._save_to_postgres, logs_df, stats)))
+            
+            # Сохраняем в CSV
+            if output_format in ["csv", "all"]:
+                csv_path = ETLConfig.OUTPUT_DIR / f"logs_{timestamp}.csv"
+                jobs.append(({'type': 'csv', 'path': str(csv_path)},
+                             ex.submit(self._save_to_csv, logs_df, csv_path)))
+            
+            # Сохраняем в Excel
+            if output_format in ["excel", "all"]:
+                excel_path = ETLConfig.OUTPUT_DIR / f"logs_{timestamp}.xlsx"
+                jobs.append(({'type': 'excel', 'path': str(excel_path)},
+                             ex.submit(self._save_to_excel, logs_df, excel_path)))
+            
+            # Сохраняем статистику
+            stats_path = ETLConfig.OUTPUT_DIR / f"stats_{timestamp}.json"
+            jobs.append(({'type': 'json', 'path': str(stats_path)},
+                         ex.submit(self._save_stats, stats, stats_path)))
+            
+            for entry, future in jobs:
+                if entry['type'] == 'postgres':
+                    # Недоступность PostgreSQL не должна ронять загрузку в файлы
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.warning("Не удалось сохранить в PostgreSQL: %s", e)
+                        continue
+                else:
+                    future.result()
+                saved_files.append(entry)
         
         return {
             'status': 'success',
@@ -478,68 +759,167 @@ class LoadTask(ETLTask):
             'loaded_at': datetime.now().isoformat()
         }
     
+    def _save_to_csv(self, df: pd.DataFrame, csv_path: Path):
+        """Сохраняет данные в CSV (UTF-8 с BOM для Excel)"""
+        if not PYARROW_AVAILABLE:
+            df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+            logger.info("Сохранено в CSV: %s", csv_path)
+            return
+        
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        
+        # Метки времени в логах посекундные: без дробной части, как у to_csv.
+        # Категориальные колонки приводим к обычным строкам
+        for i, field in enumerate(table.schema):
+            if field.name == 'Timestamp':
+                table = table.set_column(i, field.name, table.column(i).cast(pa.timestamp('s')))
+            elif pa.types.is_dictionary(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+        
+        with open(csv_path, 'wb') as f:
+            f.write(b'\xef\xbb\xbf')
+            pa_csv.write_csv(table, f, write_options=pa_csv.WriteOptions(include_header=True))
+        logger.info("Сохранено в CSV: %s", csv_path)
+    
+    def _save_to_excel(self, df: pd.DataFrame, excel_path: Path):
+        """Сохраняет данные в Excel"""
+        if XLSXWRITER_AVAILABLE:
+            # xlsxwriter заметно быстрее и экономнее openpyxl. Режим
+            # constant_memory не подходит: to_excel пишет ячейки по колонкам,
+            # а в этом режиме запись в уже сброшенные строки теряется
+            df.to_excel(excel_path, index=False, engine='xlsxwriter')
+        else:
+            df.to_excel(excel_path, index=False, engine='openpyxl')
+        logger.info("Сохранено в Excel: %s", excel_path)
+    
+    def _save_stats(self, stats: Dict, stats_path: Path):
+        """Сохраняет статистику в JSON"""
+        with open(stats_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2, ensure_ascii=False)
+    
+    def _to_copy_buffer(self, df: pd.DataFrame) -> io.StringIO:
+        """
+        Готовит CSV-буфер для COPY log_entries.
+        
+        Строки собираются из колоночных массивов, без промежуточных словарей.
+        При QUOTE_NONNUMERIC строки всегда пишутся в кавычках, а float - без
+        них, поэтому пропуски (None, NaN, NaT) заменяются на NaN и попадают
+        в CSV как голое nan, которое COPY читает как NULL (NULL 'nan').
+        Пустая строка остаётся пустой строкой ("").
+        
+        Параметры:
+            df: DataFrame с логами
+        
+        Возвращает:
+            StringIO с данными, позиция в начале
+        """
+        columns = ['Timestamp', 'Level', 'Category', 'Message',
+                   'Generalized_Message', 'file_name', 'line_number', 'log']
+        frame = df.reindex(columns=columns)
+        
+        arrays = []
+        for col in columns:
+            values = frame[col]
+            if col == 'Timestamp' and pd.api.types.is_datetime64_any_dtype(values):
+                arr = values.to_numpy(dtype='datetime64[us]')
+            elif col == 'line_number':
+                # Int64: целые без '.0' даже при наличии пропусков
+                arr = values.astype('Int64').to_numpy(dtype=object)
+            else:
+                arr = values.to_numpy(dtype=object)
+            
+            missing = pd.isna(arr)
+            if missing.any():
+                arr = arr.astype(object)
+                arr[missing] = np.nan
+            arrays.append(arr)
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerows(zip(*arrays))
+        buffer.seek(0)
+        return buffer
+    
     def _save_to_postgres(self, df: pd.DataFrame, stats: Dict):
-        """Сохраняет данные в PostgreSQL"""
-        print(">>> Сохранение в PostgreSQL...")
-        
-        conn = psycopg2.connect(
-            host=ETLConfig.POSTGRES_HOST,
-            port=ETLConfig.POSTGRES_PORT,
-            database=ETLConfig.POSTGRES_DB,
-            user=ETLConfig.POSTGRES_USER,
-            password=ETLConfig.POSTGRES_PASSWORD
-        )
+        """
+        Сохраняет данные в PostgreSQL
+        
+        Соединение из пула может оказаться разорванным (например, после
+        перезапуска сервера). При OperationalError/InterfaceError оно
+        закрывается и убирается из пула, а загрузка повторяется один раз
+        на новом соединении.
+        """
+        logger.info("Сохранение в PostgreSQL...")
+        
+        pool = _get_pg_pool()
+        buffer = self._to_copy_buffer(df)
+        
+        for attempt in range(2):
+            conn = pool.getconn()
+            broken = False
+            try:
+                self._copy_to_postgres(conn, buffer)
+                break
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                broken = True
+                if attempt:
+                    raise
+                logger.warning("Соединение с PostgreSQL разорвано (%s), повтор на новом соединении", e)
+                buffer.seek(0)
+            finally:
+                pool.putconn(conn, close=broken)
+        
+        logger.info("Загружено %s записей в PostgreSQL", len(df))
+    
+    def _copy_to_postgres(self, conn, buffer: io.StringIO):
+        """
+        Загружает CSV-буфер в log_entries одной транзакцией.
+        
+        Параметры:
+            conn: соединение psycopg2
+            buffer: CSV-буфер из _to_copy_buffer
+        """
+        global _PG_TABLE_READY
         
         try:
             cursor = conn.cursor()
             
-            # Создаём таблицу если не существует
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS log_entries (
-                    id SERIAL PRIMARY KEY,
-                    timestamp TIMESTAMP,
-                    level VARCHAR(20),
-                    category VARCHAR(100),
-                    message TEXT,
-                    generalized_message TEXT,
-                    file_name VARCHAR(255),
-                    line_number INTEGER,
-                    log TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Вставляем данные батчами
-            records = df.to_dict('records')
+            # Создаём таблицу если не существует (один раз за процесс)
+            if not _PG_TABLE_READY:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS log_entries (
+                        id SERIAL PRIMARY KEY,
+                        timestamp TIMESTAMP,
+                        level VARCHAR(20),
+                        category VARCHAR(100),
+                        message TEXT,
+                        generalized_message TEXT,
+                        file_name VARCHAR(255),
+                        line_number INTEGER,
+                        log TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
             
-            insert_query = """
-                INSERT INTO log_entries 
+            cursor.copy_expert("""
+                COPY log_entries 
                 (timestamp, level, category, message, generalized_message, 
                  file_name, line_number, log)
-                VALUES %s
-            """
-            
-            values = [
-                (
-                    r.get('Timestamp'),
-                    r.get('Level'),
-                    r.get('Category'),
-                    r.get('Message'),
-                    r.get('Generalized_Message'),
-                    r.get('file_name'),
-                    r.get('line_number'),
-                    r.get('log')
-                )
-                for r in records
-            ]
-            
-            execute_values(cursor, insert_query, values, page_size=ETLConfig.BATCH_SIZE)
+                FROM STDIN WITH (FORMAT csv, NULL 'nan')
+            """, buffer)
             
             conn.commit()
-            print(f">>> Загружено {len(records)} записей в PostgreSQL")
+            _PG_TABLE_READY = True
             
-        finally:
-            conn.close()
+        except Exception:
+            # Ошибка отката на разорванном соединении не должна
+            # подменять исходную ошибку
+            try:
+                if not conn.closed:
+                    conn.rollback()
+            except psycopg2.Error:
+                logger.debug("Не удалось откатить транзакцию", exc_info=True)
+            raise
 
 
 # =============================================================================
@@ -0,0 +1,81 @@
+"""
+Тест чтения лог-файлов в ETL: строки с символом '\\x01' не обрезаются.
+
+PyArrow-ридер в flows.etl_flow читает файл как одну колонку с
+разделителем '\\x01'. Если этот символ есть в строках (например, в
+FIX-сообщениях) в одинаковом количестве, файл разбирается без ошибки,
+но на несколько колонок - такие файлы должны читаться целиком через Python.
+
+Запуск:
+    python test_etl_read_log_lines.py
+    python -m pytest test_etl_read_log_lines.py
+"""
+import os
+import tempfile
+
+from flows.etl_flow import _parse_one_file, _read_lines_buffered, _read_log_lines
+
+FIX_MESSAGE = "rejected order 8=FIX.4.2\x0135=D\x0149=SENDER\x0156=TARGET"
+
+
+def _write_temp(content: str) -> str:
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    return path
+
+
+def _check_file(content: str):
+    path = _write_temp(content)
+    try:
+        expected = _read_lines_buffered(path)
+        lines = _read_log_lines(path)
+        # PyArrow не возвращает пустую строку после завершающего '\n'
+        assert lines.tolist() == expected[:len(lines)]
+        assert list(lines.index) == list(range(1, len(lines) + 1))
+        return _parse_one_file(path)
+    finally:
+        os.remove(path)
+
+
+def test_single_line_with_separator():
+    """Однострочный файл с '\\x01' в сообщении"""
+    df = _check_file(f"2024-01-01T00:00:01 ERROR Gateway: {FIX_MESSAGE}\n")
+    assert df['Message'].tolist() == [FIX_MESSAGE]
+    assert df['log'].tolist() == [f"2024-01-01T00:00:01 ERROR Gateway: {FIX_MESSAGE}"]
+
+
+def test_same_separator_count_on_every_line():
+    """Во всех строках одинаковое число '\\x01' - колонок больше одной"""
+    content = "".join(
+        f"2024-01-01T00:00:0{i} {level} Gateway: {FIX_MESSAGE}\n"
+        for i, level in enumerate(["ERROR", "INFO", "WARNING"], 1)
+    )
+    df = _check_file(content)
+    assert df['Message'].tolist() == [FIX_MESSAGE, FIX_MESSAGE]
+    assert df['line_number'].tolist() == [1, 3]
+
+
+def test_plain_lines():
+    """Обычный файл читается без изменений"""
+    df = _check_file(
+        "2024-01-01T00:00:01 INFO App: started\n"
+        "\n"
+        "2024-01-01T00:00:02 WARNING Disk: 91% used\r\n"
+    )
+    assert df['Message'].tolist() == ["91% used"]
+    assert df['line_number'].tolist() == [3]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ТЕСТ: чтение лог-файлов в ETL")
+    print("=" * 60)
+
+    for test in (test_single_line_with_separator,
+                 test_same_separator_count_on_every_line,
+                 test_plain_lines):
+        test()
+        print(f"✅ {test.__name__}")
+
+    print("\n✅ ВСЕ ТЕСТЫ ПРОЙДЕНЫ")